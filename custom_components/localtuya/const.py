@@ -125,6 +125,7 @@ CONF_POSITION_BASE64_DP = "position_base64_dp"
 CONF_POSITION_RELATIVE_SCALE = "position_relative_scale"
 CONF_POSITION_RELATIVE_ORIGIN = "position_relative_origin"
 CONF_POSITION_AXIS_ROTATION = "position_axis_rotation"
+CONF_POSITION_UPDATE_WINDOW = "position_update_window"
 
 # number
 CONF_MIN_VALUE = "min_value"
@@ -6,6 +6,7 @@ import logging
 import time
 from functools import partial
 
+import orjson
 import voluptuous as vol
 from homeassistant.components.vacuum import (
     DOMAIN,
@@ -18,6 +19,7 @@ from homeassistant.components.vacuum import (
     StateVacuumEntity,
     VacuumEntityFeature,
 )
+from homeassistant.core import callback
 
 from .common import LocalTuyaEntity, async_setup_entry
 from .const import (
@@ -42,6 +44,7 @@ from .const import (
     CONF_POSITION_RELATIVE_SCALE,
     CONF_POSITION_RELATIVE_ORIGIN,
     CONF_POSITION_AXIS_ROTATION,
+    CONF_POSITION_UPDATE_WINDOW,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -56,6 +59,67 @@ POSITION = "position"
 PATH = "path"
 RELATIVE_POSITION = "relative_position"
 
+# Rolling window of path points kept in the state attributes; the oldest
+# PATH_TRIM_POINTS are dropped at once so trimming is not done per sample
+MAX_PATH_POINTS = 200
+PATH_TRIM_POINTS = 50
+
+# Capability bits for optional config items
+CAP_RETURN_MODE = 1
+CAP_LOCATE = 2
+CAP_BATTERY = 4
+CAP_MODES = 8
+CAP_FAN_SPEEDS = 16
+CAP_CLEAN_TIME = 32
+CAP_CLEAN_AREA = 64
+CAP_CLEAN_RECORD = 128
+CAP_FAULT = 256
+CAP_FAN_SPEED_DP = 512
+
+CAPABILITIES = (
+    (CONF_RETURN_MODE, CAP_RETURN_MODE),
+    (CONF_LOCATE_DP, CAP_LOCATE),
+    (CONF_BATTERY_DP, CAP_BATTERY),
+    (CONF_MODES, CAP_MODES),
+    (CONF_FAN_SPEEDS, CAP_FAN_SPEEDS),
+    (CONF_CLEAN_TIME_DP, CAP_CLEAN_TIME),
+    (CONF_CLEAN_AREA_DP, CAP_CLEAN_AREA),
+    (CONF_CLEAN_RECORD_DP, CAP_CLEAN_RECORD),
+    (CONF_FAULT_DP, CAP_FAULT),
+    (CONF_FAN_SPEED_DP, CAP_FAN_SPEED_DP),
+)
+
+# Attributes copied straight from a DP: (attribute, config item, capability)
+ATTRIBUTE_DPS = (
+    (CLEAN_TIME, CONF_CLEAN_TIME_DP, CAP_CLEAN_TIME),
+    (CLEAN_AREA, CONF_CLEAN_AREA_DP, CAP_CLEAN_AREA),
+    (CLEAN_RECORD, CONF_CLEAN_RECORD_DP, CAP_CLEAN_RECORD),
+)
+
+# (sx, sy, swap) per counterclockwise axis rotation
+AXIS_ROTATIONS = {
+    0: (1, -1, False),
+    1: (1, 1, True),
+    2: (-1, 1, False),
+    3: (-1, -1, False),
+}
+
+CLEAN_ROOM_TEMPLATE = (
+    b'{"dInfo":{"ts":%d,"userId":"0"},"data":{"cmds":['
+    b'{"data":{"cleanId":[-3],"extraAreas":[],"mapId":%s,"segmentId":[%s]},'
+    b'"infoType":21023},{"data":{"mode":"reAppointClean"},"infoType":21005}],'
+    b'"mainCmds":[21005]},"infoType":30000,"message":"ok"}'
+)
+
+CLEAN_AREA_TEMPLATE = (
+    b'{"dInfo":{"ts":%d,"userId":"0"},"data":{"cmds":['
+    b'{"data":{"cleanId":[-3],"extraAreas":[{"active":"depth","id":100,'
+    b'"mode":"point","name":"aa","tag":"room","vertexs":%s}],"mapId":%s,'
+    b'"segmentId":[]},"infoType":21023},'
+    b'{"data":{"mode":"reAppointClean"},"infoType":21005}],'
+    b'"mainCmds":[21005]},"infoType":30000,"message":"ok"}'
+)
+
 DEFAULT_IDLE_STATUS = "standby,sleep"
 DEFAULT_RETURNING_STATUS = "docking"
 DEFAULT_DOCKED_STATUS = "charging,chargecompleted"
@@ -64,6 +128,30 @@ DEFAULT_FAN_SPEEDS = "low,normal,high"
 DEFAULT_PAUSED_STATE = "paused"
 DEFAULT_RETURN_MODE = "chargego"
 DEFAULT_STOP_STATUS = "standby"
+DEFAULT_POSITION_UPDATE_WINDOW = 0.2
+
+
+def split_csv(value):
+    """Split a comma separated config value into a tuple of stripped items."""
+    return tuple(item for item in map(str.strip, value.split(",")) if item)
+
+
+def encode_command(payload):
+    """Return a JSON command payload (bytes) base64 encoded."""
+    return base64.b64encode(payload).decode("ascii")
+
+
+def is_multi_point_position(raw):
+    """Return True if a raw position payload holds more than one point.
+
+    Only a cheap byte scan is done, so payloads not in compact form are
+    reported as single point and left to the JSON parser.
+    """
+    start = raw.find(b'"posArray":[[')
+    if start == -1:
+        return False
+    end = raw.find(b"]]", start)
+    return raw.find(b"],[", start, end if end != -1 else len(raw)) != -1
 
 
 def flow_schema(dps):
@@ -92,12 +180,17 @@ def flow_schema(dps):
         vol.Optional(CONF_POSITION_RELATIVE_SCALE): float,
         vol.Optional(CONF_POSITION_RELATIVE_ORIGIN): str,
         vol.Optional(CONF_POSITION_AXIS_ROTATION): int,
+        vol.Optional(
+            CONF_POSITION_UPDATE_WINDOW, default=DEFAULT_POSITION_UPDATE_WINDOW
+        ): vol.All(vol.Coerce(float), vol.Range(min=0)),
     }
 
 
 class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
     """Tuya vacuum device."""
 
+    _unrecorded_attributes = frozenset({PATH})
+
     def __init__(self, device, config_entry, switchid, **kwargs):
         """Initialize a new LocaltuyaVacuum."""
         super().__init__(device, config_entry, switchid, _LOGGER, **kwargs)
@@ -105,24 +198,27 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
         self._battery_level = None
         self._attrs = {}
 
-        self._idle_status_list = []
+        self._idle_status_list = ()
         if self.has_config(CONF_IDLE_STATUS_VALUE):
-            self._idle_status_list = self._config[CONF_IDLE_STATUS_VALUE].split(",")
+            self._idle_status_list = split_csv(self._config[CONF_IDLE_STATUS_VALUE])
 
-        self._modes_list = []
+        self._modes_list = ()
         if self.has_config(CONF_MODES):
-            self._modes_list = self._config[CONF_MODES].split(",")
+            self._modes_list = split_csv(self._config[CONF_MODES])
             self._attrs[MODES_LIST] = self._modes_list
 
-        self._docked_status_list = []
+        self._docked_status_list = ()
         if self.has_config(CONF_DOCKED_STATUS_VALUE):
-            self._docked_status_list = self._config[CONF_DOCKED_STATUS_VALUE].split(",")
+            self._docked_status_list = split_csv(self._config[CONF_DOCKED_STATUS_VALUE])
 
-        self._fan_speed_list = []
+        self._fan_speed_list = ()
         if self.has_config(CONF_FAN_SPEEDS):
-            self._fan_speed_list = self._config[CONF_FAN_SPEEDS].split(",")
+            self._fan_speed_list = split_csv(self._config[CONF_FAN_SPEEDS])
 
-        self._attrs[PATH] = []
+        # Path is stored as separate x/y columns, exposed as-is to HA
+        self._path_x = []
+        self._path_y = []
+        self._attrs[PATH] = {"x": self._path_x, "y": self._path_y}
 
         self._position_relative_scale = 1
         if self.has_config(CONF_POSITION_RELATIVE_SCALE):
@@ -136,33 +232,101 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
         if self.has_config(CONF_POSITION_AXIS_ROTATION):
             self._position_axis_rotation = self._config[CONF_POSITION_AXIS_ROTATION]
 
+        # (sx, sy, swap) sign/swap matrix for the configured axis rotation
+        sx, sy, swap = AXIS_ROTATIONS.get(self._position_axis_rotation, (1, 1, False))
+        scale = self._position_relative_scale
+        ox = self._position_relative_origin[0]
+        oy = self._position_relative_origin[1]
+        # Affine (a, b, c, d, tx, ty) coefficients: x' = a*x + b*y + tx
+        # A zero scale has no inverse, so absolute positions are unavailable
+        self._abs_affine = None
+        if swap:
+            self._rel_affine = (0, sy * scale, sx * scale, 0, ox, oy)
+            if scale:
+                self._abs_affine = (
+                    0,
+                    sy / scale,
+                    sx / scale,
+                    0,
+                    -sy * oy / scale,
+                    -sx * ox / scale,
+                )
+        else:
+            self._rel_affine = (sx * scale, 0, 0, sy * scale, ox, oy)
+            if scale:
+                self._abs_affine = (
+                    sx / scale,
+                    0,
+                    0,
+                    sy / scale,
+                    -sx * ox / scale,
+                    -sy * oy / scale,
+                )
+
+        self._powergo_dp = self._config[CONF_POWERGO_DP]
+        self._mode_dp = self._config.get(CONF_MODE_DP)
+        self._fan_speed_dp = self._config.get(CONF_FAN_SPEED_DP)
+        self._locate_dp = self._config.get(CONF_LOCATE_DP)
+        self._return_mode = self._config.get(CONF_RETURN_MODE)
+        self._returning_status_value = self._config.get(CONF_RETURNING_STATUS_VALUE)
+        self._paused_state = self._config.get(CONF_PAUSED_STATE)
+
+        # Later entries win, matching the precedence of idle > docked >
+        # returning > paused status values
+        self._state_map = {}
+        if self._paused_state is not None:
+            self._state_map[self._paused_state] = STATE_PAUSED
+        if self._returning_status_value is not None:
+            self._state_map[self._returning_status_value] = STATE_RETURNING
+        self._state_map.update(dict.fromkeys(self._docked_status_list, STATE_DOCKED))
+        self._state_map.update(dict.fromkeys(self._idle_status_list, STATE_IDLE))
+
+        self._caps = 0
+        for conf, cap in CAPABILITIES:
+            if self.has_config(conf):
+                self._caps |= cap
+
+        self._attr_supported_features = (
+            VacuumEntityFeature.START
+            | VacuumEntityFeature.PAUSE
+            | VacuumEntityFeature.STOP
+            | VacuumEntityFeature.STATUS
+            | VacuumEntityFeature.STATE
+            | VacuumEntityFeature.SEND_COMMAND
+        )
+        if self._caps & CAP_RETURN_MODE:
+            self._attr_supported_features |= VacuumEntityFeature.RETURN_HOME
+        if self._caps & CAP_FAN_SPEED_DP:
+            self._attr_supported_features |= VacuumEntityFeature.FAN_SPEED
+        if self._caps & CAP_BATTERY:
+            self._attr_supported_features |= VacuumEntityFeature.BATTERY
+        if self._caps & CAP_LOCATE:
+            self._attr_supported_features |= VacuumEntityFeature.LOCATE
+
+        self._dp_key = str(self._dp_id)
+        self._battery_dp_key = str(self._config.get(CONF_BATTERY_DP))
+        self._mode_dp_key = str(self._mode_dp)
+        self._fan_speed_dp_key = str(self._fan_speed_dp)
+        self._fault_dp_key = str(self._config.get(CONF_FAULT_DP))
+        self._attribute_dps = tuple(
+            (attr, str(self._config[conf]))
+            for attr, conf, cap in ATTRIBUTE_DPS
+            if self._caps & cap
+        )
+        self._position_b64_dp_key = None
+        if self.has_config(CONF_POSITION_BASE64_DP):
+            self._position_b64_dp_key = str(self._config[CONF_POSITION_BASE64_DP])
+        self._last_position_b64 = None
+        self._position_update_window = self._config.get(
+            CONF_POSITION_UPDATE_WINDOW, DEFAULT_POSITION_UPDATE_WINDOW
+        )
+        self._pending_position = None
+        self._pos_flush_handle = None
+
         self._fan_speed = ""
         self._cleaning_mode = ""
         _LOGGER.debug("Initialized vacuum [%s]", self.name)
 
-    @property
-    def supported_features(self):
-        """Flag supported features."""
-        supported_features = (
-                VacuumEntityFeature.START
-                | VacuumEntityFeature.PAUSE
-                | VacuumEntityFeature.STOP
-                | VacuumEntityFeature.STATUS
-                | VacuumEntityFeature.STATE
-                | VacuumEntityFeature.SEND_COMMAND
-        )
-
-        if self.has_config(CONF_RETURN_MODE):
-            supported_features = supported_features | VacuumEntityFeature.RETURN_HOME
-        if self.has_config(CONF_FAN_SPEED_DP):
-            supported_features = supported_features | VacuumEntityFeature.FAN_SPEED
-        if self.has_config(CONF_BATTERY_DP):
-            supported_features = supported_features | VacuumEntityFeature.BATTERY
-        if self.has_config(CONF_LOCATE_DP):
-            supported_features = supported_features | VacuumEntityFeature.LOCATE
-
-        return supported_features
-
     @property
     def state(self):
         """Return the vacuum state."""
@@ -184,31 +348,29 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
         return self._fan_speed
 
     @property
-    def fan_speed_list(self) -> list:
+    def fan_speed_list(self) -> tuple:
         """Return the list of available fan speeds."""
         return self._fan_speed_list
 
     async def async_start(self, **kwargs):
         """Turn the vacuum on and start cleaning."""
-        await self._device.set_dp(True, self._config[CONF_POWERGO_DP])
+        await self._device.set_dp(True, self._powergo_dp)
 
     async def async_pause(self, **kwargs):
         """Stop the vacuum cleaner, do not return to base."""
-        await self._device.set_dp(False, self._config[CONF_POWERGO_DP])
+        await self._device.set_dp(False, self._powergo_dp)
 
     async def async_return_to_base(self, **kwargs):
         """Set the vacuum cleaner to return to the dock."""
-        if self.has_config(CONF_RETURN_MODE):
-            await self._device.set_dp(
-                self._config[CONF_RETURN_MODE], self._config[CONF_MODE_DP]
-            )
+        if self._caps & CAP_RETURN_MODE:
+            await self._device.set_dp(self._return_mode, self._mode_dp)
         else:
             _LOGGER.error("Missing command for return home in commands set.")
 
     async def async_stop(self, **kwargs):
         """Turn the vacuum off stopping the cleaning."""
         # Perform pause action instead of stop, added myself
-        await self._device.set_dp(False, self._config[CONF_POWERGO_DP])
+        await self._device.set_dp(False, self._powergo_dp)
 
     async def async_clean_spot(self, **kwargs):
         """Perform a spot clean-up."""
@@ -216,20 +378,24 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
 
     async def async_locate(self, **kwargs):
         """Locate the vacuum cleaner."""
-        if self.has_config(CONF_LOCATE_DP):
-            await self._device.set_dp("", self._config[CONF_LOCATE_DP])
+        if self._caps & CAP_LOCATE:
+            await self._device.set_dp("", self._locate_dp)
 
     async def async_set_fan_speed(self, fan_speed, **kwargs):
         """Set the fan speed."""
-        await self._device.set_dp(fan_speed, self._config[CONF_FAN_SPEED_DP])
+        await self._device.set_dp(fan_speed, self._fan_speed_dp)
 
     def get_command_params_clean(self, vertices, map_id):
-        return {'dInfo': {'ts': int(time.time() * 1000), 'userId': '0'}, 'data': {'cmds': [
-            {'data': {'cleanId': [-3], 'extraAreas': [
-                {"active": "depth", "id": 100, "mode": "point", "name": "aa", "tag": "room",
-                 "vertexs": vertices}], 'mapId': map_id, 'segmentId': []}, 'infoType': 21023},
-            {'data': {'mode': 'reAppointClean'}, 'infoType': 21005}], 'mainCmds': [21005]}, 'infoType': 30000,
-                'message': 'ok'}
+        """Return the JSON clean command for a polygon."""
+        return CLEAN_AREA_TEMPLATE % (
+            time.time_ns() // 1_000_000,
+            orjson.dumps(vertices),
+            orjson.dumps(map_id),
+        )
+
+    def _build_clean_payload(self, vertices, map_id):
+        """Return the base64 encoded clean command for a polygon."""
+        return encode_command(self.get_command_params_clean(vertices, map_id))
 
     async def async_send_command(self, command, params=None, **kwargs):
         """Send a command to a vacuum cleaner."""
@@ -238,15 +404,16 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
 
         if command == "set_mode" and "mode" in params:
             mode = params["mode"]
-            await self._device.set_dp(mode, self._config[CONF_MODE_DP])
+            await self._device.set_dp(mode, self._mode_dp)
         elif command == "clean_room":
             room_id = params.get("room", 4)
             map_id = params.get("map_id", 1695662532)
-            command_params = {'dInfo': {'ts': int(time.time() * 1000), 'userId': '0'}, 'data': {'cmds': [
-                {'data': {'cleanId': [-3], 'extraAreas': [], 'mapId': map_id, 'segmentId': [room_id]},
-                 'infoType': 21023}, {'data': {'mode': 'reAppointClean'}, 'infoType': 21005}], 'mainCmds': [21005]},
-                              'infoType': 30000, 'message': 'ok'}
-            base64_string = base64.b64encode(json.dumps(command_params).encode('utf-8')).decode('utf-8')
+            command_params = CLEAN_ROOM_TEMPLATE % (
+                time.time_ns() // 1_000_000,
+                orjson.dumps(map_id),
+                orjson.dumps(room_id),
+            )
+            base64_string = encode_command(command_params)
             await self._device.set_dp(base64_string, 127)
         elif command == "clean_spot":
             x = params.get("x", .5)
@@ -256,122 +423,174 @@ class LocaltuyaVacuum(LocalTuyaEntity, StateVacuumEntity):
             _LOGGER.info(f"Absolute position: {x, y}")
 
             map_id = params.get("map_id", 1695662532)
-            command_params = self.get_command_params_clean(
+            base64_string = self._build_clean_payload(
                 [[x - size / 2, y - size / 2], [x - size / 2, y + size / 2], [x + size / 2, y + size / 2],
                  [x + size / 2, y - size / 2]], map_id)
-            base64_string = base64.b64encode(json.dumps(command_params).encode('utf-8')).decode('utf-8')
             await self._device.set_dp(base64_string, 127)
         elif command == "clean_area":
             if 'vertices' in params:
                 vertices = params['vertices']
             else:
-                relative_vertices = params.get("relative_vertices", [])
-                vertices = []
-                for x, y in relative_vertices:
-                    x, y = self.calculate_absolute_position(x, y)
-                    vertices.append([x, y])
+                vertices = self.calculate_absolute_positions(
+                    params.get("relative_vertices", [])
+                )
 
             map_id = params.get("map_id", 1695662532)
-            command_params = self.get_command_params_clean(vertices, map_id)
-            base64_string = base64.b64encode(json.dumps(command_params).encode('utf-8')).decode('utf-8')
+            base64_string = await self.hass.async_add_executor_job(
+                self._build_clean_payload, vertices, map_id
+            )
             await self._device.set_dp(base64_string, 127)
 
-    def rotate_coordinates(self, px, py):
-        if self._position_axis_rotation == 0:
-            px, py = px, -py
-        elif self._position_axis_rotation == 1:
-            px, py = py, px
-        elif self._position_axis_rotation == 2:
-            px, py = -px, py
-        elif self._position_axis_rotation == 3:
-            px, py = -px, -py
-        return px, py
-
     def get_relative_position(self):
+        """Return the last position mapped onto the relative floorplan."""
         position = self._attrs.get(POSITION, None)
         if position is None:
             return None
         px, py = position
-        px, py = self.rotate_coordinates(px, py)
-
-        px = px * self._position_relative_scale + self._position_relative_origin[0]
-        py = py * self._position_relative_scale + self._position_relative_origin[1]
-
-        return [px, py]
+        a, b, c, d, tx, ty = self._rel_affine
+        return [a * px + b * py + tx, c * px + d * py + ty]
 
     def calculate_absolute_position(self, x, y):
-        px = (x - self._position_relative_origin[0]) / self._position_relative_scale
-        py = (y - self._position_relative_origin[1]) / self._position_relative_scale
-
-        px, py = self.rotate_coordinates(px, py)
-
-        return round(px), round(py)
+        """Map a relative floorplan position to device coordinates."""
+        if self._abs_affine is None:
+            raise ValueError("Position relative scale must not be 0")
+        a, b, c, d, tx, ty = self._abs_affine
+        return round(a * x + b * y + tx), round(c * x + d * y + ty)
+
+    def calculate_absolute_positions(self, relative_vertices):
+        """Map a list of relative floorplan vertices to device coordinates."""
+        if self._abs_affine is None:
+            raise ValueError("Position relative scale must not be 0")
+        a, b, c, d, tx, ty = self._abs_affine
+        return [
+            [round(a * x + b * y + tx), round(c * x + d * y + ty)]
+            for x, y in relative_vertices
+        ]
 
     def status_updated(self, status):
         """Device status was updated."""
-        state_value = str(self.dps(self._dp_id))
         previous_state = self._state
-
-        if state_value in self._idle_status_list:
-            self._state = STATE_IDLE
-        elif state_value in self._docked_status_list:
-            self._state = STATE_DOCKED
-        elif state_value == self._config[CONF_RETURNING_STATUS_VALUE]:
-            self._state = STATE_RETURNING
-        elif state_value == self._config[CONF_PAUSED_STATE]:
-            self._state = STATE_PAUSED
-        else:
-            self._state = STATE_CLEANING
+        self._state = self._state_map.get(str(status.get(self._dp_key)), STATE_CLEANING)
 
         if previous_state == STATE_DOCKED and self._state != STATE_DOCKED:
-            self._attrs[PATH] = []
-            _LOGGER.info("Resetting PATH")
+            self.hass.loop.call_soon_threadsafe(self._async_reset_path)
 
-        if self.has_config(CONF_BATTERY_DP):
-            self._battery_level = self.dps_conf(CONF_BATTERY_DP)
+        caps = self._caps
+        if caps & CAP_BATTERY:
+            self._battery_level = status.get(self._battery_dp_key)
 
         self._cleaning_mode = ""
-        if self.has_config(CONF_MODES):
-            self._cleaning_mode = self.dps_conf(CONF_MODE_DP)
+        if caps & CAP_MODES:
+            self._cleaning_mode = status.get(self._mode_dp_key)
             self._attrs[MODE] = self._cleaning_mode
 
         self._fan_speed = ""
-        if self.has_config(CONF_FAN_SPEEDS):
-            self._fan_speed = self.dps_conf(CONF_FAN_SPEED_DP)
+        if caps & CAP_FAN_SPEEDS:
+            self._fan_speed = status.get(self._fan_speed_dp_key)
 
-        if self.has_config(CONF_CLEAN_TIME_DP):
-            self._attrs[CLEAN_TIME] = self.dps_conf(CONF_CLEAN_TIME_DP)
+        for attr, dp_key in self._attribute_dps:
+            self._attrs[attr] = status.get(dp_key)
 
-        if self.has_config(CONF_CLEAN_AREA_DP):
-            self._attrs[CLEAN_AREA] = self.dps_conf(CONF_CLEAN_AREA_DP)
-
-        if self.has_config(CONF_CLEAN_RECORD_DP):
-            self._attrs[CLEAN_RECORD] = self.dps_conf(CONF_CLEAN_RECORD_DP)
-
-        if self.has_config(CONF_FAULT_DP):
-            self._attrs[FAULT] = self.dps_conf(CONF_FAULT_DP)
+        if caps & CAP_FAULT:
+            self._attrs[FAULT] = status.get(self._fault_dp_key)
             if self._attrs[FAULT] != 0:
                 self._state = STATE_ERROR
 
-        if self.has_config(CONF_POSITION_BASE64_DP):
-            if str(self._config.get(CONF_POSITION_BASE64_DP)) in status:
-                position = self.dps_conf(CONF_POSITION_BASE64_DP)
-                try:
-                    decoded_json = json.loads(base64.b64decode(position))
-                    position_array = decoded_json.get('data', {}).get('posArray', [])
-
-                    if position_array is not None and len(position_array) == 1:
-                        last_position = self._attrs.get(POSITION, None)
-                        new_position = position_array[0]
-                        if last_position != new_position:
-                            self._attrs[POSITION] = new_position
-                            relative_position = self.get_relative_position()
-                            if relative_position is not None:
-                                self._attrs[RELATIVE_POSITION] = relative_position
-                                # self._attrs[PATH].append(relative_position)
-                except (json.JSONDecodeError, TypeError, IndexError, binascii.Error):
-                    _LOGGER.debug("Couldn't parse position")
-                    _LOGGER.debug(f"Raw message: {position}")
+        if self._position_b64_dp_key is not None:
+            position = status.get(self._position_b64_dp_key)
+            if position is not None and position != self._last_position_b64:
+                self._update_position(position)
+
+    def _update_position(self, position):
+        """Decode a base64 position payload and update the position attributes."""
+        try:
+            raw = binascii.a2b_base64(position)
+            if is_multi_point_position(raw):
+                self._last_position_b64 = position
+                return
+            decoded_json = orjson.loads(raw)
+            position_array = decoded_json.get('data', {}).get('posArray', [])
+
+            if position_array is not None and len(position_array) == 1:
+                # Status updates arrive off the event loop; position state
+                # and the flush timer are only touched on the loop
+                self.hass.loop.call_soon_threadsafe(
+                    self._async_queue_position, position_array[0]
+                )
+            self._last_position_b64 = position
+        except (ValueError, TypeError, IndexError, binascii.Error):
+            _LOGGER.debug("Couldn't parse position")
+            _LOGGER.debug(f"Raw message: {position}")
+
+    @callback
+    def _async_reset_path(self):
+        """Clear the cleaning path."""
+        self._path_x.clear()
+        self._path_y.clear()
+        _LOGGER.info("Resetting PATH")
+
+    @callback
+    def _async_queue_position(self, position):
+        """Coalesce position samples and publish them once per update window.
+
+        While a flush is pending it is the only state writer, so pushes in
+        the window are written once, together with the newest position.
+        """
+        last_position = self._pending_position
+        if last_position is None:
+            last_position = self._attrs.get(POSITION, None)
+        if last_position == position:
+            return
+        self._pending_position = position
+        if self._position_update_window <= 0:
+            self._flush_position(write_state=False)
+        elif self._pos_flush_handle is None:
+            self._pos_flush_handle = self.hass.loop.call_later(
+                self._position_update_window, self._flush_position
+            )
+
+    @callback
+    def _flush_position(self, write_state=True):
+        """Move the pending position into the state attributes."""
+        self._pos_flush_handle = None
+        if self._pending_position is None:
+            return
+        self._attrs[POSITION] = self._pending_position
+        self._pending_position = None
+        relative_position = self.get_relative_position()
+        if relative_position is not None:
+            self._attrs[RELATIVE_POSITION] = relative_position
+            self._path_x.append(relative_position[0])
+            self._path_y.append(relative_position[1])
+            if len(self._path_x) > MAX_PATH_POINTS:
+                del self._path_x[:PATH_TRIM_POINTS]
+                del self._path_y[:PATH_TRIM_POINTS]
+        if write_state:
+            self.async_write_ha_state()
+
+    def schedule_update_ha_state(self, force_refresh=False):
+        """Schedule a state write unless a pending position flush will do it.
+
+        The check runs on the loop, queued after any position update from
+        the same status push, so it sees the flush timer that push started.
+        """
+        if force_refresh:
+            super().schedule_update_ha_state(force_refresh)
+            return
+        self.hass.loop.call_soon_threadsafe(self._async_write_state_unless_pending)
+
+    @callback
+    def _async_write_state_unless_pending(self):
+        """Write the state if no position flush is pending."""
+        if self._pos_flush_handle is None:
+            self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self):
+        """Cancel a pending position update."""
+        if self._pos_flush_handle is not None:
+            self._pos_flush_handle.cancel()
+            self._pos_flush_handle = None
+        await super().async_will_remove_from_hass()
 
 
 async_setup_entry = partial(async_setup_entry, DOMAIN, LocaltuyaVacuum, flow_schema)